@@ -0,0 +1,200 @@
+# AgentCommon.py
+# Match fetching, indexing and chat helpers shared by agent.py and agentBot.py
+
+import asyncio
+import os
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+from semantic_kernel.contents import AuthorRole
+from urllib3.util.retry import Retry
+
+API_FOOTBALL_URL = "https://v3.football.api-sports.io/fixtures"
+MEMORY_COLLECTION_NAME = "footballMatches"
+FETCH_MAX_WORKERS = 8
+EMBEDDING_BATCH_SIZE = 100  # Gemini accepts at most 100 texts per embedding request
+HISTORY_MAX_TURNS = 8  # user/assistant pairs rendered into each prompt
+MATCH_INDEX_MAX_AGE = 6 * 60 * 60  # seconds; fixtures change about daily
+
+# Compiled once into a prompt function at startup instead of being re-parsed on every message
+PROMPT_TEMPLATE = """
+{{$history}}
+
+Use the following context to answer the user's question.
+If the user asks for a reminder, use the information in the context to call the calendar tool.
+
+CONTEXT:
+{{$context}}
+"""
+
+# Shared keep-alive session so the per-day requests reuse pooled connections
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=Retry(total=3, backoff_factor=0.3)))
+
+def fetch_matches_for_date(date_str):
+    """Fetches the matches played on a single date, or returns None if the request failed.
+
+    Returns the formatted match texts and, in the same order, the (date, home, away) of each fixture.
+    """
+    formatted_matches = []
+    fixtures = []
+    params = {"date": date_str}
+
+    try:
+        response = _SESSION.get(API_FOOTBALL_URL, params=params)
+        response.raise_for_status()
+        data = response.json().get('response', [])
+
+        for match in data:
+            fixture = match.get('fixture') or {}
+            status = fixture.get('status') or {}
+            teams = match.get('teams') or {}
+            goals = match.get('goals') or {}
+            league = match.get('league') or {}
+
+            score_suffix = (
+                f" Final score was {goals.get('home', '?')} - {goals.get('away', '?')}."
+                if status.get('short') == 'FT' else ""
+            )
+            kickoff = fixture.get('date', date_str)
+            home = (teams.get('home') or {}).get('name', 'N/A')
+            away = (teams.get('away') or {}).get('name', 'N/A')
+            formatted_matches.append(
+                f"On {kickoff[:16].replace('T', ' at ')}, in the {league.get('name', 'N/A')}, a match between "
+                f"{home} and {away} is scheduled. Status: {status.get('long', 'Scheduled')}.{score_suffix}"
+            )
+            fixtures.append((kickoff[:10], home, away))
+    except Exception as e:
+        print(f"Error fetching data for {date_str}: {e}")
+        return None
+
+    return formatted_matches, fixtures
+
+def fetch_match_data(api_key, days_past=1, days_future=7):
+    """Fetches match data for a given date range.
+
+    Returns the formatted matches, their (date, home, away) fixtures and whether every date was fetched successfully.
+    """
+    print("Fetching match data...")
+
+    today = datetime.now()
+    dates = [
+        (today + timedelta(days=i)).strftime("%Y-%m-%d")
+        for i in range(-days_past, days_future + 1)
+    ]
+
+    # Set once on the session instead of building the same headers for every request
+    _SESSION.headers["x-apisports-key"] = api_key
+
+    # Each day is a separate request, so fetch them concurrently
+    all_formatted_matches = []
+    all_fixtures = []
+    failed_dates = 0
+    with ThreadPoolExecutor(max_workers=FETCH_MAX_WORKERS) as executor:
+        for result in executor.map(fetch_matches_for_date, dates):
+            if result is None:
+                failed_dates += 1
+            else:
+                all_formatted_matches.extend(result[0])
+                all_fixtures.extend(result[1])
+
+    print(f"✅ Successfully fetched {len(all_formatted_matches)} matches.")
+    if failed_dates:
+        print(f"⚠️ {failed_dates} of {len(dates)} dates could not be fetched.")
+    return all_formatted_matches, all_fixtures, failed_dates == 0
+
+def load_match_index(path, embedding_model_id, max_age=MATCH_INDEX_MAX_AGE):
+    """Returns the (match_data, fixtures, embeddings) saved by a recent run, or None if there is no fresh, usable copy."""
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path) as data:
+            if str(data["model"]) != embedding_model_id or time.time() - float(data["ts"]) > max_age:
+                return None
+            return data["texts"].tolist(), [tuple(fixture) for fixture in data["fixtures"].tolist()], data["E"]
+    except (OSError, KeyError, ValueError, zipfile.BadZipFile) as e:
+        # A corrupt or old-format file just means fetching and embedding again
+        print(f"Ignoring unreadable match index {path}: {e}")
+        return None
+
+def save_match_index(path, embedding_model_id, match_data, fixtures, embeddings):
+    """Saves the embedded matches so the next start can skip fetching and embedding them."""
+    np.savez_compressed(
+        path, E=embeddings, texts=np.array(match_data), fixtures=np.array(fixtures, dtype=str),
+        model=np.array(embedding_model_id), ts=time.time(),
+    )
+
+async def index_match_data(memory_store, embedding_service, match_data, embeddings=None):
+    """Embeds the match texts in batches (unless embeddings are given) and upserts them into the memory store.
+
+    Returns the embeddings so the caller can persist them.
+    """
+    if not await memory_store.does_collection_exist(MEMORY_COLLECTION_NAME):
+        await memory_store.create_collection(MEMORY_COLLECTION_NAME)
+
+    if embeddings is None:
+        batches = [
+            match_data[start:start + EMBEDDING_BATCH_SIZE]
+            for start in range(0, len(match_data), EMBEDDING_BATCH_SIZE)
+        ]
+        batch_embeddings = await asyncio.gather(
+            *[embedding_service.generate_embeddings(batch) for batch in batches]
+        )
+        embeddings = np.vstack(batch_embeddings).astype(np.float32)
+
+    ids = [f"match_{i}" for i in range(len(match_data))]
+    await memory_store.upsert_embeddings(MEMORY_COLLECTION_NAME, ids, match_data, embeddings)
+    return embeddings
+
+async def prepare_match_memory(
+    memory_store, embedding_service, match_lookup, api_key, index_path, embedding_model_id, days_past=1, days_future=7
+):
+    """Loads the matches into the memory store and the match lookup.
+
+    Reuses the index saved by a recent run if there is one; otherwise fetches the matches for the
+    given window, embeds them and saves the index for the next start.
+    """
+    match_index = load_match_index(index_path, embedding_model_id)
+    if match_index:
+        match_data, fixtures, embeddings = match_index
+        fetch_complete = False  # already saved; re-saving would keep extending its lifetime
+        print(f"✅ Loaded {len(match_data)} matches from {index_path}.")
+    else:
+        match_data, fixtures, fetch_complete = await asyncio.to_thread(fetch_match_data, api_key, days_past, days_future)
+        embeddings = None
+    if not match_data:
+        return
+
+    print("Indexing match data into memory...")
+    embeddings = await index_match_data(memory_store, embedding_service, match_data, embeddings)
+    # Only pin a complete corpus; after a failed day the next start should fetch again
+    if fetch_complete:
+        save_match_index(index_path, embedding_model_id, match_data, fixtures, embeddings)
+    match_lookup.add(match_data, fixtures)
+    print("✅ Indexing complete.")
+
+async def get_context(match_lookup, cached_search, user_input):
+    """Returns the match context for a question, from the exact lookup if it pins the matches down."""
+    # A date or team name in the question can be answered without embedding it
+    context_matches = match_lookup.find(user_input)
+    if context_matches:
+        return match_lookup.build_context_text(context_matches)
+    return await cached_search.search(user_input)
+
+def trim_history(history, max_turns=HISTORY_MAX_TURNS):
+    """Keeps the system message plus about the last max_turns user/assistant pairs.
+
+    Counts messages rather than pairs, since a failed turn leaves a user message without a reply,
+    and then drops leading replies so the kept window always opens with a user message.
+    """
+    messages = history.messages
+    excess = len(messages) - (2 * max_turns + 1)
+    if excess > 0:
+        del messages[1:1 + excess]
+    while len(messages) > 1 and messages[1].role != AuthorRole.USER:
+        del messages[1]
@@ -0,0 +1,40 @@
+# CachedMemorySearch.py
+
+import asyncio
+
+from cachetools import TTLCache
+
+class CachedMemorySearch:
+    """Caches the RAG context for recent queries so repeated questions skip the embedding and vector search."""
+
+    def __init__(self, memory, collection, build_context, limit=10, min_relevance_score=0.6, maxsize=512, ttl=300):
+        self._memory = memory
+        self._collection = collection
+        self._build_context = build_context
+        self._limit = limit
+        self._min_relevance_score = min_relevance_score
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._in_flight = {}
+
+    async def search(self, query):
+        """Returns the context text for the query, sharing one search between concurrent identical queries."""
+        key = " ".join(query.lower().split())
+        if key in self._cache:
+            return self._cache[key]
+
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._search(key, query))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # Shield the shared search so one cancelled caller doesn't cancel it for the others
+        return await asyncio.shield(task)
+
+    async def _search(self, key, query):
+        search_results = await self._memory.search(
+            collection=self._collection, query=query, limit=self._limit, min_relevance_score=self._min_relevance_score
+        )
+        # Results come back most relevant first, which is the order the model should see them in
+        context_text = self._build_context([result.text for result in search_results])
+        self._cache[key] = context_text
+        return context_text
@@ -0,0 +1,204 @@
+# FaissMemoryStore.py
+
+import faiss
+import numpy as np
+
+from semantic_kernel.exceptions import ServiceResourceNotFoundError
+from semantic_kernel.memory.memory_record import MemoryRecord
+from semantic_kernel.memory.memory_store_base import MemoryStoreBase
+
+
+class _FaissCollection:
+    """The HNSW index of one collection plus the records it points to."""
+
+    def __init__(self):
+        self.index = None
+        self.records: dict[int, MemoryRecord] = {}
+        self.key_to_id: dict[str, int] = {}
+        self.next_id = 0
+
+    @property
+    def stale_count(self) -> int:
+        # HNSW cannot delete vectors, so removed/overwritten ids stay in the index until it is rebuilt
+        return 0 if self.index is None else self.index.ntotal - len(self.records)
+
+
+class FaissMemoryStore(MemoryStoreBase):
+    """A memory store that keeps embeddings in a FAISS HNSW index instead of scanning them linearly.
+
+    Vectors are L2-normalized on insert so the inner product search returns cosine similarity,
+    the same relevance score the VolatileMemoryStore reports.
+
+    By default the index stores the vectors as float16 (half the memory the search has to scan).
+    Pass faiss.ScalarQuantizer.QT_8bit for a quarter, with value ranges trained on the first batch
+    upserted into each collection, or None to keep full float32 vectors.
+    """
+
+    def __init__(self, hnsw_m: int = 16, ef_search: int = 64, quantizer_type=faiss.ScalarQuantizer.QT_fp16):
+        self._hnsw_m = hnsw_m
+        self._ef_search = ef_search
+        self._quantizer_type = quantizer_type
+        self._collections: dict[str, _FaissCollection] = {}
+
+    def _get_collection(self, collection_name: str) -> _FaissCollection:
+        if collection_name not in self._collections:
+            raise ServiceResourceNotFoundError(f"Collection '{collection_name}' does not exist")
+        return self._collections[collection_name]
+
+    def _build_index(self, vectors: np.ndarray):
+        dimension = vectors.shape[1]
+        if self._quantizer_type is None:
+            hnsw_index = faiss.IndexHNSWFlat(dimension, self._hnsw_m, faiss.METRIC_INNER_PRODUCT)
+        else:
+            hnsw_index = faiss.IndexHNSWSQ(dimension, self._quantizer_type, self._hnsw_m, faiss.METRIC_INNER_PRODUCT)
+        hnsw_index.hnsw.efSearch = self._ef_search
+
+        index = faiss.IndexIDMap2(hnsw_index)
+        if not index.is_trained:
+            index.train(vectors)
+        return index
+
+    @staticmethod
+    def _normalized(vectors) -> np.ndarray:
+        matrix = np.array(vectors, dtype=np.float32, ndmin=2)
+        faiss.normalize_L2(matrix)
+        return matrix
+
+    @staticmethod
+    def _copy_record(record: MemoryRecord, embedding) -> MemoryRecord:
+        return MemoryRecord(
+            is_reference=record._is_reference,
+            external_source_name=record._external_source_name,
+            id=record._id,
+            description=record._description,
+            text=record._text,
+            additional_metadata=record._additional_metadata,
+            embedding=embedding,
+            key=record._key,
+            timestamp=record._timestamp,
+        )
+
+    def _to_result(self, collection: _FaissCollection, faiss_id: int, with_embedding: bool) -> MemoryRecord:
+        record = collection.records[faiss_id]
+        if not with_embedding:
+            return record
+        return self._copy_record(record, collection.index.reconstruct(faiss_id))
+
+    async def create_collection(self, collection_name: str) -> None:
+        if collection_name not in self._collections:
+            self._collections[collection_name] = _FaissCollection()
+
+    async def get_collections(self) -> list[str]:
+        return list(self._collections)
+
+    async def delete_collection(self, collection_name: str) -> None:
+        self._collections.pop(collection_name, None)
+
+    async def does_collection_exist(self, collection_name: str) -> bool:
+        return collection_name in self._collections
+
+    async def upsert(self, collection_name: str, record: MemoryRecord) -> str:
+        return (await self.upsert_batch(collection_name, [record]))[0]
+
+    async def upsert_batch(self, collection_name: str, records: list[MemoryRecord]) -> list[str]:
+        if not records:
+            return []
+        return self._add(
+            self._get_collection(collection_name), self._normalized([record.embedding for record in records]), records
+        )
+
+    async def upsert_embeddings(
+        self, collection_name: str, ids: list[str], texts: list[str], embeddings: np.ndarray
+    ) -> list[str]:
+        """Upserts texts whose embeddings are already stacked in one (N, dim) matrix.
+
+        Skips building a MemoryRecord per embedding only to stack the vectors back together.
+        """
+        if not ids:
+            return []
+        records = [
+            MemoryRecord.local_record(id=id, text=text, description=None, additional_metadata=None, embedding=None)
+            for id, text in zip(ids, texts)
+        ]
+        return self._add(self._get_collection(collection_name), self._normalized(embeddings), records)
+
+    def _add(self, collection: _FaissCollection, vectors: np.ndarray, records: list[MemoryRecord]) -> list[str]:
+        if collection.index is None:
+            collection.index = self._build_index(vectors)
+
+        ids = np.arange(collection.next_id, collection.next_id + len(records), dtype=np.int64)
+        collection.index.add_with_ids(vectors, ids)
+        collection.next_id += len(records)
+
+        keys = []
+        for faiss_id, record in zip(ids.tolist(), records):
+            record._key = record._id
+            old_id = collection.key_to_id.get(record._key)
+            if old_id is not None:
+                del collection.records[old_id]
+            # The vector lives in the index, so the stored record does not keep its own copy
+            collection.records[faiss_id] = self._copy_record(record, None)
+            collection.key_to_id[record._key] = faiss_id
+            keys.append(record._key)
+        return keys
+
+    async def get(self, collection_name: str, key: str, with_embedding: bool = False) -> MemoryRecord:
+        collection = self._get_collection(collection_name)
+        if key not in collection.key_to_id:
+            raise ServiceResourceNotFoundError(f"Key '{key}' not found in collection '{collection_name}'")
+        return self._to_result(collection, collection.key_to_id[key], with_embedding)
+
+    async def get_batch(self, collection_name: str, keys: list[str], with_embeddings: bool = False) -> list[MemoryRecord]:
+        collection = self._get_collection(collection_name)
+        return [
+            self._to_result(collection, collection.key_to_id[key], with_embeddings)
+            for key in keys
+            if key in collection.key_to_id
+        ]
+
+    async def remove(self, collection_name: str, key: str) -> None:
+        await self.remove_batch(collection_name, [key])
+
+    async def remove_batch(self, collection_name: str, keys: list[str]) -> None:
+        collection = self._get_collection(collection_name)
+        for key in keys:
+            faiss_id = collection.key_to_id.pop(key, None)
+            if faiss_id is not None:
+                del collection.records[faiss_id]
+
+    async def get_nearest_matches(
+        self,
+        collection_name: str,
+        embedding: np.ndarray,
+        limit: int,
+        min_relevance_score: float = 0.0,
+        with_embeddings: bool = False,
+    ) -> list[tuple[MemoryRecord, float]]:
+        collection = self._collections.get(collection_name)
+        if collection is None or not collection.records:
+            return []
+
+        # Over-fetch by the number of stale vectors so removed entries cannot crowd out live ones
+        k = min(limit + collection.stale_count, collection.index.ntotal)
+        scores, ids = collection.index.search(self._normalized(embedding), k)
+
+        matches = []
+        for score, faiss_id in zip(scores[0].tolist(), ids[0].tolist()):
+            if faiss_id not in collection.records or score < min_relevance_score:
+                continue
+            matches.append((self._to_result(collection, faiss_id, with_embeddings), score))
+            if len(matches) == limit:
+                break
+        return matches
+
+    async def get_nearest_match(
+        self,
+        collection_name: str,
+        embedding: np.ndarray,
+        min_relevance_score: float = 0.0,
+        with_embedding: bool = False,
+    ) -> tuple[MemoryRecord, float] | None:
+        matches = await self.get_nearest_matches(
+            collection_name, embedding, limit=1, min_relevance_score=min_relevance_score, with_embeddings=with_embedding
+        )
+        return matches[0] if matches else None
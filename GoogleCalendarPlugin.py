@@ -1,25 +1,45 @@
 # GoogleCalendarPlugin.py
 
+import asyncio
 import os.path
 import json
+import logging
 import re
+import threading
 from datetime import datetime, timedelta, timezone
 
+import google_auth_httplib2
+import httplib2
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
+from googleapiclient import errors
 from googleapiclient.discovery import build
 from semantic_kernel.functions import kernel_function
 
+logger = logging.getLogger(__name__)
+
+# Matches a date and time pattern like '2025-07-23 at 19:00'
+_DATETIME_RE = re.compile(r"(\d{4}-\d{2}-\d{2}) at (\d{2}:\d{2})")
+# How long before expiry the access token is refreshed in the background
+_REFRESH_MARGIN = timedelta(minutes=5)
+_EVENT_DURATION = timedelta(hours=2)  # Assume 2-hour duration
+
 class GoogleCalendarPlugin:
     """A plugin to interact with Google Calendar."""
     
     SCOPES = ["https://www.googleapis.com/auth/calendar.events"]
 
+    def __init__(self):
+        self._creds = None
+        self._service = None
+        self._refresh_lock = threading.Lock()
+        self._refresh_timer = None
+
     def _get_credentials(self):
         """Gets valid user credentials for the Google Calendar API."""
-        creds = None
-        if os.path.exists("token.json"):
+        creds = self._creds
+        if not creds and os.path.exists("token.json"):
             creds = Credentials.from_authorized_user_file("token.json", self.SCOPES)
             
         if not creds or not creds.valid:
@@ -28,15 +48,62 @@ class GoogleCalendarPlugin:
             else:
                 flow = InstalledAppFlow.from_client_secrets_file("credentials.json", self.SCOPES)
                 creds = flow.run_local_server(port=0)
-            with open("token.json", "w") as token:
-                token.write(creds.to_json())
+            self._save_credentials(creds)
         return creds
 
+    def _save_credentials(self, creds):
+        """Persists the credentials so the next run can reuse them."""
+        with open("token.json", "w") as token:
+            token.write(creds.to_json())
+
+    def _schedule_refresh(self):
+        """Schedules a background refresh of the access token shortly before it expires."""
+        if self._refresh_timer:
+            self._refresh_timer.cancel()
+        if not self._creds.expiry or not self._creds.refresh_token:
+            return
+
+        # google-auth stores the expiry as a naive UTC datetime
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        delay = (self._creds.expiry - _REFRESH_MARGIN - now).total_seconds()
+        self._refresh_timer = threading.Timer(max(delay, 0), self._refresh_in_background)
+        self._refresh_timer.daemon = True
+        self._refresh_timer.start()
+
+    def _refresh_in_background(self):
+        """Refreshes the access token off the request path so tool calls never wait on it."""
+        with self._refresh_lock:
+            try:
+                self._creds.refresh(Request())
+                self._save_credentials(self._creds)
+            except Exception as e:
+                # The next tool call falls back to a blocking refresh once the token has expired
+                print(f"\n--- [Calendar Plugin] Background token refresh failed: {e} ---")
+                return
+            self._schedule_refresh()
+
+    def _ensure_service(self):
+        """Returns the cached Calendar service, rebuilding it only when the credentials are no longer valid."""
+        if self._service_needs_rebuild():
+            with self._refresh_lock:
+                # Another caller may have rebuilt it while we waited for the lock
+                if self._service_needs_rebuild():
+                    self._creds = self._get_credentials()
+                    # Use the discovery document bundled with the client instead of fetching it
+                    self._service = build(
+                        "calendar", "v3", credentials=self._creds, cache_discovery=False, static_discovery=True
+                    )
+                    self._schedule_refresh()
+        return self._service
+
+    def _service_needs_rebuild(self):
+        return self._service is None or self._creds is None or not self._creds.valid
+
     @kernel_function(
         description="Creates an event in the user's Google Calendar.",
         name="create_calendar_event"
     )
-    def create_calendar_event(
+    async def create_calendar_event(
         self,
         summary: str,
         match_context: str,
@@ -54,17 +121,16 @@ class GoogleCalendarPlugin:
         
         try:
             # --- NEW: Reliably parse date and time from the context string ---
-            # This regex finds a date and time pattern like '2025-07-23 at 19:00'
-            match = re.search(r"(\d{4}-\d{2}-\d{2}) at (\d{2}:\d{2})", match_context)
+            match = _DATETIME_RE.search(match_context)
             if not match:
                 return "Failed to create event: could not find a valid date and time in the match details."
 
             date_str, time_str = match.groups()
-            start_utc = datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %H:%M").replace(tzinfo=timezone.utc)
-            end_utc = start_utc + timedelta(hours=2) # Assume 2-hour duration
+            start_utc = datetime.fromisoformat(f"{date_str}T{time_str}:00+00:00")
+            end_utc = start_utc + _EVENT_DURATION
 
-            creds = self._get_credentials()
-            service = build("calendar", "v3", credentials=creds)
+            # Credential loading and the API call are blocking, so keep them off the event loop
+            service = await asyncio.to_thread(self._ensure_service)
 
             event = {
                 "summary": summary,
@@ -74,9 +140,12 @@ class GoogleCalendarPlugin:
                 "end": {"dateTime": end_utc.isoformat()},
             }
 
-            print("\n  Sending the following event object to Google:")
-            print(json.dumps(event, indent=2))
-            created_event = service.events().insert(calendarId="primary", body=event).execute()
+            logger.debug("Sending event: %s", event)
+            request = service.events().insert(calendarId="primary", body=event)
+            # httplib2 is not thread-safe, so each call gets its own authorized connection rather than
+            # sharing the cached service's one with parallel tool calls running in other threads
+            http = google_auth_httplib2.AuthorizedHttp(self._creds, http=httplib2.Http())
+            created_event = await asyncio.to_thread(request.execute, http=http)
             print("\n  Received a successful response from Google.")
             
             return f"Successfully created a calendar event titled '{summary}'."
@@ -0,0 +1,73 @@
+# MatchLookup.py
+
+import re
+from collections import defaultdict
+
+_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+MAX_CONTEXT_CHARS = 1500
+
+class MatchLookup:
+    """An exact date/team side index over the match texts, used to skip vector search for obvious queries."""
+
+    def __init__(self, limit=10):
+        self.limit = limit
+        self._by_date = defaultdict(list)
+        self._by_team = defaultdict(list)
+        self._fixtures = {}
+        self._team_re = None
+
+    def add(self, match_data, fixtures):
+        """Indexes the formatted match texts by date and (lowercased) team name.
+
+        fixtures holds the (date, home, away) of each text, taken from the API response rather than
+        parsed back out of the sentence, where a team like "Brighton and Hove Albion" is ambiguous.
+        """
+        for match, fixture in zip(match_data, fixtures):
+            date_str, home, away = fixture
+            self._fixtures[match] = fixture
+            self._by_date[date_str].append(match)
+            self._by_team[home.lower()].append(match)
+            self._by_team[away.lower()].append(match)
+
+        # Longest names first so "Real Madrid W" wins over "Real Madrid"
+        teams = sorted(self._by_team, key=len, reverse=True)
+        if teams:
+            # Lookarounds rather than \b, which never matches after names ending in punctuation ("Sporting C.P.")
+            self._team_re = re.compile(r"(?<!\w)(?:" + "|".join(map(re.escape, teams)) + r")(?!\w)")
+
+    def build_context_text(self, matches, max_chars=MAX_CONTEXT_CHARS):
+        """Joins the matches most-relevant-first into prompt context, skipping repeated fixtures and capping its length."""
+        seen = set()
+        lines = []
+        length = 0
+        for match in matches:
+            key = self._fixtures.get(match, match)
+            if key in seen:
+                continue
+            if lines and length + len(match) + 1 > max_chars:
+                break
+            seen.add(key)
+            lines.append(match)
+            length += len(match) + 1
+        return "\n".join(lines)
+
+    def find(self, query):
+        """Returns the matches referenced by a date or team name in the query.
+
+        Returns an empty list, so the caller falls back to vector search, when the query names nothing
+        or names something too broad (a whole matchday) to pick the relevant matches from.
+        """
+        date_hits = [match for date_str in _DATE_RE.findall(query) for match in self._by_date.get(date_str, [])]
+        team_hits = []
+        if self._team_re:
+            team_hits = [match for team in self._team_re.findall(query.lower()) for match in self._by_team[team]]
+
+        if date_hits and team_hits:
+            # A date plus a team pins down the fixture; if they don't overlap, try each on its own
+            team_set = set(team_hits)
+            hits = [match for match in date_hits if match in team_set] or date_hits + team_hits
+        else:
+            hits = date_hits or team_hits
+        hits = list(dict.fromkeys(hits))
+        # Truncating an unranked list would just keep whichever matches were fetched first
+        return hits if len(hits) <= self.limit else []
@@ -1,22 +1,26 @@
 import asyncio
+import os
 import nest_asyncio
-import requests
-from datetime import datetime, timedelta
+import time
 
 # Telegram Imports
 from telegram import Update
+from telegram.error import BadRequest
 from telegram.ext import Application, CommandHandler, MessageHandler, filters, ContextTypes
 
 # Semantic Kernel Google AI Imports
 import semantic_kernel as sk
 from semantic_kernel.contents import ChatHistory
-from semantic_kernel.functions import KernelArguments
+from semantic_kernel.functions import KernelArguments, KernelFunctionFromPrompt
 from semantic_kernel.connectors.ai.google.google_ai import (GoogleAIChatCompletion, GoogleAITextEmbedding)
 from semantic_kernel.connectors.ai.google.google_ai import GoogleAIChatPromptExecutionSettings
 from semantic_kernel.connectors.ai.function_choice_behavior import FunctionChoiceBehavior
-from semantic_kernel.memory import VolatileMemoryStore, SemanticTextMemory
-from semantic_kernel.memory.memory_record import MemoryRecord
+from semantic_kernel.memory import SemanticTextMemory
 from GoogleCalendarPlugin import GoogleCalendarPlugin
+from FaissMemoryStore import FaissMemoryStore
+from MatchLookup import MatchLookup
+from CachedMemorySearch import CachedMemorySearch
+from AgentCommon import MEMORY_COLLECTION_NAME, PROMPT_TEMPLATE, get_context, prepare_match_memory, trim_history
 
 nest_asyncio.apply()
 
@@ -28,49 +32,19 @@ load_dotenv()
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 API_FOOTBALL_KEY = os.getenv("API_FOOTBALL_KEY")
-API_FOOTBALL_URL = "https://v3.football.api-sports.io/fixtures"
 GEMINI_MODEL_ID = "gemini-1.5-flash"
 EMBEDDING_MODEL_ID = "models/embedding-001"
-MEMORY_COLLECTION_NAME = "footballMatches"
+STREAM_EDIT_INTERVAL = 1.0  # seconds; Telegram rate-limits message edits
+MATCH_INDEX_PATH = "match_index.npz"
 
 # --- Global objects for the AI Kernel and Memory ---
 kernel: sk.Kernel = None
 memory: SemanticTextMemory = None
-execution_settings: GoogleAIChatPromptExecutionSettings = None
+match_lookup: MatchLookup = None
+cached_search: CachedMemorySearch = None
+chat_function: KernelFunctionFromPrompt = None
 system_message: str = ""
 
-def fetch_match_data(days_past=1, days_future=7):
-    print("Fetching match data...")
-    all_formatted_matches = []
-    today = datetime.now()
-    for i in range(-days_past, days_future + 1):
-        target_date = today + timedelta(days=i)
-        date_str = target_date.strftime("%Y-%m-%d")
-        params = {"date": date_str}
-        headers = {"x-apisports-key": API_FOOTBALL_KEY}
-        try:
-            response = requests.get(API_FOOTBALL_URL, headers=headers, params=params)
-            response.raise_for_status()
-            data = response.json().get('response', [])
-            if not data: continue
-            for match in data:
-                fixture = match.get('fixture', {})
-                teams = match.get('teams', {})
-                goals = match.get('goals', {})
-                league = match.get('league', {})
-                match_info = (
-                    f"On {fixture.get('date', date_str)[:16].replace('T', ' at ')}, in the {league.get('name', 'N/A')}, a match between "
-                    f"{teams.get('home', {}).get('name', 'N/A')} and {teams.get('away', {}).get('name', 'N/A')} "
-                    f"is scheduled. Status: {fixture.get('status', {}).get('long', 'Scheduled')}."
-                )
-                if fixture.get('status', {}).get('short') == 'FT':
-                     match_info += f" Final score was {goals.get('home', '?')} - {goals.get('away', '?')}."
-                all_formatted_matches.append(match_info)
-        except Exception as e:
-            print(f"Error fetching data for {date_str}: {e}")
-    print(f"✅ Successfully fetched {len(all_formatted_matches)} matches.")
-    return all_formatted_matches
-
 
 # --- Telegram Handler Functions  ---
 async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -92,25 +66,40 @@ async def handle_text_message(update: Update, context: ContextTypes.DEFAULT_TYPE
     user_input = update.message.text
     
     try:
-        search_results = await memory.search(collection=MEMORY_COLLECTION_NAME, query=user_input, limit=10)
-        context_text = "\n".join([result.text for result in search_results])
+        context_text = await get_context(match_lookup, cached_search, user_input)
         history.add_user_message(user_input)
         
-        arguments = KernelArguments(settings=execution_settings, history=history, context=context_text)
-        prompt_template = """
-        {{$history}}
-
-        Use the following context to answer the user's question.
-        If the user asks for a reminder, use the information in the context to call the calendar tool.
-        
-        CONTEXT:
-        {{$context}}
-        """
-        result = await kernel.invoke_prompt(prompt=prompt_template, arguments=arguments)
+        arguments = KernelArguments(history=history, context=context_text)
+        # Stream the answer into one Telegram message, editing it at most once per STREAM_EDIT_INTERVAL
+        response_str = ""
+        reply = None
+        sent_text = ""
+        last_edit = 0.0
+        async for chunk in kernel.invoke_stream(chat_function, arguments=arguments):
+            response_str += "".join(str(message) for message in chunk)
+            # Function call/result chunks add no text; Telegram rejects edits that don't change the message
+            if not response_str.strip() or response_str == sent_text:
+                continue
+            if time.monotonic() - last_edit < STREAM_EDIT_INTERVAL:
+                continue
+            if reply is None:
+                reply = await update.message.reply_text(response_str)
+            else:
+                try:
+                    await reply.edit_text(response_str)
+                except BadRequest as e:
+                    # A failed progress update shouldn't fail the turn; the final edit below catches up
+                    print(f"Skipping streamed edit: {e}")
+                    continue
+            sent_text = response_str
+            last_edit = time.monotonic()
         
-        response_str = str(result)
         history.add_assistant_message(response_str)
-        await update.message.reply_text(response_str)
+        trim_history(history)
+        if reply is None:
+            await update.message.reply_text(response_str)
+        elif response_str != sent_text:
+            await reply.edit_text(response_str)
     except Exception as e:
         error_message = f"An error occurred: {e}"
         print(error_message)
@@ -118,27 +107,24 @@ async def handle_text_message(update: Update, context: ContextTypes.DEFAULT_TYPE
 
 async def setup_agent():
     """Initializes all the AI components and indexes the data."""
-    global kernel, memory, execution_settings, system_message
+    global kernel, memory, match_lookup, cached_search, chat_function, system_message
     
     kernel = sk.Kernel()
     chat_service = GoogleAIChatCompletion(gemini_model_id=GEMINI_MODEL_ID, api_key=GEMINI_API_KEY)
     embedding_service = GoogleAITextEmbedding(embedding_model_id=EMBEDDING_MODEL_ID, api_key=GEMINI_API_KEY)
     kernel.add_service(chat_service)
 
-    memory_store = VolatileMemoryStore()
+    memory_store = FaissMemoryStore()
     memory = SemanticTextMemory(storage=memory_store, embeddings_generator=embedding_service)
+    match_lookup = MatchLookup()
+    cached_search = CachedMemorySearch(memory, MEMORY_COLLECTION_NAME, match_lookup.build_context_text)
     kernel.add_plugin(GoogleCalendarPlugin(), plugin_name="Calendar")
     print("✅ AI Kernel, Memory, and Plugins initialized.")
 
-    match_data = fetch_match_data(days_past=1, days_future=2)
-    if match_data:
-        print("Indexing match data into memory...")
-        # This simple loop is the correct way to bypass the error.
-        for i, match in enumerate(match_data):
-            await memory.save_information(
-                collection=MEMORY_COLLECTION_NAME, id=f"match_{i}", text=match
-            )
-        print("✅ Indexing complete.")
+    await prepare_match_memory(
+        memory_store, embedding_service, match_lookup, API_FOOTBALL_KEY, MATCH_INDEX_PATH, EMBEDDING_MODEL_ID,
+        days_past=1, days_future=2,
+    )
     
     system_message = (
         "You are a helpful football assistant named Leo. Your primary goal is to answer user questions with the help on a given CONTEXT of match data. "
@@ -148,6 +134,10 @@ async def setup_agent():
         "Always check the conversation history to understand which match the user is referring to. If unable to find ask to provide information again."
     )
     execution_settings = GoogleAIChatPromptExecutionSettings(function_choice_behavior=FunctionChoiceBehavior.Auto())
+    # Not added to the kernel, so the model is never offered it as a tool
+    chat_function = KernelFunctionFromPrompt(
+        function_name="answer", plugin_name="Chat", prompt=PROMPT_TEMPLATE, prompt_execution_settings=execution_settings
+    )
 
 async def main() -> None:
     """Starts the Telegram bot listener."""